@@ -1,13 +1,16 @@
+import functools
 import pickle
+import sys
 import re
 import math
-import random
 import pkgutil
-from collections import Iterable
+from collections import Counter
+from collections.abc import Iterable
 from pkg_resources import resource_filename
 
 from nltk.corpus import wordnet
-from scipy.optimize import curve_fit
+from numba import njit
+from scipy.optimize import brentq
 import numpy as np
 
 __version__ = '0.1'
@@ -20,14 +23,55 @@ FILE_MAP = {
     'SUPP': resource_filename('pelitk', 'data/wordlists/supplementary.txt')
 }
 
-# lookup table created from NGSL and spaCy word lists
-LOOKUP = pickle.loads(pkgutil.get_data('pelitk', 'data/lemmatizer.pkl'))
+# shared generator for subsampling; PCG64 supports fast bulk draws
+_RNG = np.random.default_rng()
 
+_TOKEN_RE = re.compile(r"[A-Za-z]+")
 
+
+@functools.lru_cache(maxsize=None)
+def _get_lookup():
+    """
+    Lemma lookup table created from NGSL and spaCy word lists, deserialized
+    lazily so importing the module stays cheap.
+    """
+    raw = pickle.loads(pkgutil.get_data('pelitk', 'data/lemmatizer.pkl'))
+    # intern so hot tokens compare by identity and duplicates share storage
+    return {sys.intern(key): sys.intern(value) for key, value in raw.items()}
+
+
+def __getattr__(name):
+    # keep the old module-level LOOKUP name working without paying the
+    # deserialization cost at import
+    if name == 'LOOKUP':
+        return _get_lookup()
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
+
+
+@functools.lru_cache(maxsize=None)
 def _load_wordlist(key):
     with open(FILE_MAP[key]) as f_in:
-        wordlist = set([x.strip().lower() for x in f_in.readlines()])
-    return wordlist
+        return frozenset(sys.intern(line.strip().lower()) for line in f_in)
+
+
+@functools.lru_cache(maxsize=None)
+def _freq_set(freq_list, supplementary):
+    """
+    Cached union of a frequency list with the supplementary vocabulary.
+    """
+    common_types = _load_wordlist(freq_list)
+    if supplementary:
+        common_types = common_types.union(_load_wordlist('SUPP'))
+    return common_types
+
+
+@functools.lru_cache(maxsize=None)
+def _get_enable1():
+    """
+    Cached ENABLE1 spellcheck dictionary, extended with 'i' and 'a'.
+    """
+    return _load_wordlist('ENABLE1') | {'i', 'a'}
 
 
 def re_tokenize(text):
@@ -38,7 +82,38 @@ def re_tokenize(text):
     Returns:
         List of tokens found in input string
     """
-    return re.findall(r"[A-Za-z]+", text.lower())
+    return _TOKEN_RE.findall(text.lower())
+
+
+class LexDoc:
+    """ A token list with its derived views precomputed once.
+
+    Scoring the same document with several metrics rebuilds the type set,
+    token count and id encoding in each call; wrap the tokens in a LexDoc
+    and pass it to ttr/mtld/vocd/maas/adv_guiraud to share that work.
+
+    Attributes:
+        tokens (List[str]): the token list
+        unique (frozenset): the set of types
+        n (int): number of tokens
+        counts (Counter): occurrences per type
+        ids (np.ndarray): int32 token encoding by order of first occurrence
+    """
+
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+        self.unique = frozenset(self.tokens)
+        self.n = len(self.tokens)
+        self.counts = Counter(self.tokens)
+        self.ids = _token_ids(self.tokens)
+
+
+@functools.lru_cache(maxsize=200000)
+def _has_synset(lemma):
+    """
+    Cached check for whether a lemma appears in wordnet.synsets().
+    """
+    return bool(wordnet.synsets(lemma))
 
 
 def spellcheck_filter(tokens):
@@ -50,7 +125,10 @@ def spellcheck_filter(tokens):
     Returns:
         filtered list of tokens
     """
-    return [t for t in tokens if wordnet.synsets(LOOKUP.get(t, t))]
+    lookup = _get_lookup()
+    # decide each type once; the filter itself is then set membership
+    keep = {t for t in set(tokens) if _has_synset(lookup.get(t, t))}
+    return [t for t in tokens if t in keep]
 
 
 def adv_guiraud(tokens,
@@ -82,64 +160,87 @@ def adv_guiraud(tokens,
     if custom_list is not None:
         if not isinstance(custom_list, Iterable):
             raise TypeError("Please specify a list of strings for custom_list")
-        common_types = set(custom_list)
+        if isinstance(custom_list, (set, frozenset)):
+            common_types = custom_list
+        else:
+            common_types = frozenset(custom_list)
+        if supplementary:
+            common_types = common_types.union(_load_wordlist('SUPP'))
     else:
         if freq_list not in FILE_MAP:
             raise KeyError("Please specify set freq_list to one of {}".format(
                 ", ".join(FILE_MAP.keys())))
 
-        common_types = _load_wordlist(freq_list)
-    # Include supplementary
-    if supplementary:
-        common_types = common_types.union(_load_wordlist('SUPP'))
+        common_types = _freq_set(freq_list, supplementary)
 
-    # TODO: can we use the same spellchecking everywhere?
-    # here we use enable1, elsewhere we use wordnet.synsets()
-    dictionary = _load_wordlist('ENABLE1')
-    dictionary.add('i')
-    dictionary.add('a')
+    if isinstance(tokens, LexDoc):
+        unique_tokens = tokens.unique
+        num_tokens = tokens.n
+    else:
+        unique_tokens = set(tokens)
+        num_tokens = len(tokens)
 
-    if not len(tokens):
+    if not num_tokens:
         return 0
 
-    advanced = set()
-    for token in tokens:
-        if not lemmas:
-            lemma = LOOKUP.get(token, token)
-        else:
-            lemma = token
-        if lemma not in common_types:
-            if spellcheck:
-                if lemma in dictionary:
-                    advanced.add(lemma)
-            else:
-                advanced.add(lemma)
+    if lemmas:
+        token_lemmas = unique_tokens
+    else:
+        lookup = _get_lookup()
+        # dedupe before mapping so repeated tokens hit LOOKUP only once
+        token_lemmas = {lookup.get(token, token) for token in unique_tokens}
+
+    advanced = token_lemmas - common_types
+    # TODO: can we use the same spellchecking everywhere?
+    # here we use enable1, elsewhere we use wordnet.synsets()
+    if spellcheck:
+        advanced &= _get_enable1()
 
-    return len(advanced) / math.sqrt(len(tokens))
+    return len(advanced) / math.sqrt(num_tokens)
 
 
 def _estimate_d(N, TTR):
     """
-    Finds value for D to fit to curve, minimizing squared error
+    Finds value for D fitting the TTR curve to the observed means.
+
+    The mean residual is monotonic in D, so a bracketed scalar root find
+    replaces the Levenberg-Marquardt machinery of curve_fit and converges
+    in a handful of iterations with no per-call setup.
     """
-    # initial guess of 100 for D
-    popt, _ = curve_fit(_vocd_eq, N, TTR, p0=[100])
-    return popt[0]
 
+    def mean_residual(D):
+        return np.mean(_vocd_eq(N, D) - TTR)
+
+    # with no token repetition the TTRs sit at 1.0 and the residual never
+    # crosses zero, so the bracket has no root
+    if mean_residual(1e6) <= 0:
+        raise ValueError("""Text has (nearly) no repeated tokens in the
+                            sampled range, so D is unbounded. Try a longer
+                            text or one with more repeated tokens.""")
+    return brentq(mean_residual, 1e-3, 1e6)
 
+
+@njit(cache=True, fastmath=True)
 def _vocd_eq(N, D):
     """
     Equation for approximating TTR as function of N and D as described at
     http://www.leeds.ac.uk/educol/documents/00001541.htm
+
+    Compiled with an explicit loop: the N arrays here are tiny, so numpy's
+    per-operation dispatch would cost more than the arithmetic itself.
     """
-    return D / N * (np.sqrt(1 + 2 * N / D) - 1)
+    out = np.empty(N.shape[0], dtype=np.float64)
+    for i in range(N.shape[0]):
+        out[i] = D / N[i] * (math.sqrt(1 + 2 * N[i] / D) - 1)
+    return out
 
 
 def vocd(tokens,
          spellcheck=False,
          length_range=(35, 50),
          num_subsamples=100,
-         num_trials=3):
+         num_trials=3,
+         seed=None):
     """
     Calculate 'D' with voc-D method (approximation of HD-D)
     Inspired by
@@ -154,33 +255,90 @@ def vocd(tokens,
         num_subsamples (int): number of subsamples to take per sample
             size
         num_trials (int): number of trials to average over
+        seed: optional seed (or numpy Generator) for reproducible
+            subsampling; by default a generator shared across calls is used
 
     Returns:
         avg_D (float): estimated D value
     """
-    if spellcheck:
-        tokens = spellcheck_filter(tokens)
-
-    if len(tokens) < length_range[1]:
+    if isinstance(tokens, LexDoc) and not spellcheck:
+        ids = tokens.ids
+        num_tokens = tokens.n
+    else:
+        if isinstance(tokens, LexDoc):
+            tokens = tokens.tokens
+        elif not isinstance(tokens, list):
+            tokens = list(tokens)
+        if spellcheck:
+            tokens = spellcheck_filter(tokens)
+        ids = _token_ids(tokens)
+        num_tokens = len(tokens)
+
+    if num_tokens < length_range[1]:
         raise ValueError("""Sample size greater than population!. Either reduce
                             the bounds of length_range or try a different
                             text.""")
-    total_d = 0
-    for i in range(num_trials):
-        # calculate a D value each trial and average them all
-        ttr_list = []
-        n_list = []
-        for sample_size in range(length_range[0], length_range[1] + 1):
-            total_ttr = 0
-            for j in range(num_subsamples):
-                total_ttr += ttr(random.sample(tokens, sample_size))
-            avg_ttr = total_ttr / num_subsamples
-            ttr_list.append(avg_ttr)
-            n_list.append(sample_size)
-        D = _estimate_d(np.array(n_list), np.array(ttr_list))
-        total_d += D
-    avg_d = total_d / num_trials
-    return avg_d
+    rng = _RNG if seed is None else np.random.default_rng(seed)
+    # trials are independent averages of subsample TTRs, so draw them all
+    # per sample size and fit the curve once
+    ttr_list = []
+    n_list = []
+    for sample_size in range(length_range[0], length_range[1] + 1):
+        avg_ttr = _subsample_ttr(ids, sample_size,
+                                 num_trials * num_subsamples, rng)
+        ttr_list.append(avg_ttr)
+        n_list.append(sample_size)
+    return _estimate_d(np.array(n_list), np.array(ttr_list))
+
+
+def vocd_batch(token_lists,
+               spellcheck=False,
+               length_range=(35, 50),
+               num_subsamples=100,
+               num_trials=3,
+               seed=None):
+    """
+    Compute vocd for each token list in a batch.
+
+    The cached wordlists and lemma lookup are shared across documents, and
+    all documents draw from a single generator, so per-call overhead is
+    paid once. Pass a seed for a reproducible batch.
+
+    Args:
+        token_lists (List[List[str]]): one token list per document
+        (remaining args as for vocd)
+
+    Returns:
+        list of estimated D values, one per document
+    """
+    rng = _RNG if seed is None else np.random.default_rng(seed)
+    return [
+        vocd(tokens,
+             spellcheck=spellcheck,
+             length_range=length_range,
+             num_subsamples=num_subsamples,
+             num_trials=num_trials,
+             seed=rng) for tokens in token_lists
+    ]
+
+
+def _subsample_ttr(ids, sample_size, num_subsamples, rng):
+    """
+    Average TTR over num_subsamples random subsamples of sample_size tokens,
+    drawn without replacement from an id-encoded token array. Each draw
+    picks sample_size indices directly, so the cost per subsample scales
+    with the sample size rather than the document length, and all rows are
+    counted in a few vectorized operations.
+    """
+    samples = np.empty((num_subsamples, sample_size), dtype=ids.dtype)
+    for i in range(num_subsamples):
+        samples[i] = ids[rng.choice(ids.shape[0],
+                                    size=sample_size,
+                                    replace=False,
+                                    shuffle=False)]
+    samples = np.sort(samples, axis=1)
+    num_types = (np.diff(samples, axis=1, prepend=-1) != 0).sum(axis=1)
+    return (num_types / sample_size).mean()
 
 
 def ttr(tokens):
@@ -191,6 +349,8 @@ def ttr(tokens):
     Returns:
         TTR computed via num_unique_types / num_tokens
     """
+    if isinstance(tokens, LexDoc):
+        return len(tokens.unique) / tokens.n
     return len(set(tokens)) / len(tokens)
 
 
@@ -198,32 +358,87 @@ def mtld(tokens, spellcheck=False, factor_size=0.72):
     """
     Implements the Measure of Textual Lexical Diversity (MTLD)
     """
-    if spellcheck:
-        tokens = spellcheck_filter(tokens)
-
-    forward_factor_count = _mtld_pass(tokens, factor_size)
-    backward_factor_count = _mtld_pass(tokens[::-1], factor_size)
+    if isinstance(tokens, LexDoc) and not spellcheck:
+        ids = tokens.ids
+        num_tokens = tokens.n
+    else:
+        if isinstance(tokens, LexDoc):
+            tokens = tokens.tokens
+        elif not isinstance(tokens, list):
+            tokens = list(tokens)
+        if spellcheck:
+            tokens = spellcheck_filter(tokens)
+        ids = _token_ids(tokens)
+        num_tokens = len(tokens)
+
+    forward_factor_count = _mtld_pass_nb(ids, factor_size)
+    # the backward pass runs over a reversed view, not a copy
+    backward_factor_count = _mtld_pass_nb(ids[::-1], factor_size)
     if forward_factor_count == 0 or backward_factor_count == 0:
         raise ValueError("""Text ttr never fell below the specified
                             factor_size. Try increasing factor_size parameter
                             or using input with more repeated tokens. """)
-    mtld = (len(tokens) / forward_factor_count +
-            len(tokens) / backward_factor_count) / 2
+    mtld = (num_tokens / forward_factor_count +
+            num_tokens / backward_factor_count) / 2
     return mtld
 
 
-def _mtld_pass(tokens, factor_size):
+def mtld_batch(token_lists, spellcheck=False, factor_size=0.72):
+    """
+    Compute mtld for each token list in a batch, sharing the cached
+    wordlists, lemma lookup and compiled pass across documents.
+
+    Args:
+        token_lists (List[List[str]]): one token list per document
+        (remaining args as for mtld)
+
+    Returns:
+        list of mtld values, one per document
+    """
+    return [
+        mtld(tokens, spellcheck=spellcheck, factor_size=factor_size)
+        for tokens in token_lists
+    ]
+
+
+def _token_ids(tokens):
     """
-    Helper function for mtld, computing one pass of mtld with given tokens.
+    Encode tokens as an int32 id array, numbering types in order of first
+    occurrence.
     """
-    current_idx = 0
-    factor_count = 0
-    for i in range(1, len(tokens) + 1):
-        this_slice = tokens[current_idx:i]
-        this_ttr = ttr(this_slice)
+    tok2id = {}
+    ids = np.empty(len(tokens), dtype=np.int32)
+    for i, token in enumerate(tokens):
+        ids[i] = tok2id.setdefault(token, len(tok2id))
+    return ids
+
+
+@njit(cache=True)
+def _mtld_pass_nb(ids, factor_size):
+    """
+    Compiled mtld pass over an id-encoded token array. Types seen in the
+    current factor are tracked in an epoch-stamped array so a factor break
+    resets in O(1).
+    """
+    factor_count = 0.0
+    if ids.shape[0] == 0:
+        return factor_count
+    seen = np.zeros(ids.max() + 1, dtype=np.int32)
+    epoch = 1
+    num_types = 0
+    length = 0
+    this_ttr = 1.0
+    for i in range(ids.shape[0]):
+        if seen[ids[i]] != epoch:
+            seen[ids[i]] = epoch
+            num_types += 1
+        length += 1
+        this_ttr = num_types / length
         if this_ttr < factor_size:
-            factor_count += 1
-            current_idx = i
+            factor_count += 1.0
+            epoch += 1
+            num_types = 0
+            length = 0
     # account for remainder factor count
     if this_ttr > factor_size:
         factor_count += (1.0 - this_ttr) / (1.0 - factor_size)
@@ -234,10 +449,16 @@ def maas(tokens, spellcheck=False):
     """
     Compute the a^2 Maas index.
     """
-    if spellcheck:
-        tokens = spellcheck_filter(tokens)
-    num_tokens = len(tokens)
-    num_types = len(set(tokens))
+    if isinstance(tokens, LexDoc) and not spellcheck:
+        num_tokens = tokens.n
+        num_types = len(tokens.unique)
+    else:
+        if isinstance(tokens, LexDoc):
+            tokens = tokens.tokens
+        if spellcheck:
+            tokens = spellcheck_filter(tokens)
+        num_tokens = len(tokens)
+        num_types = len(set(tokens))
     a_squared = math.log(num_tokens) - \
         math.log(num_types) / math.log(num_tokens)**2
     return a_squared
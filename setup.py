@@ -20,7 +20,7 @@ setup(name='pelitk',
       author_email='naraehan@pitt.edu',
       url='https://github.com/ELI-Data-Mining-Group/pelitk',
       license=license,
-      install_requires=['nltk', 'scipy', 'numpy'],
+      install_requires=['nltk', 'numba', 'scipy', 'numpy'],
       packages=find_packages(exclude=('tests', 'docs')),
       package_data={'pelitk': ['data/wordlists/*.txt', 'data/*.pkl']},
       include_package_data=True)
@@ -28,7 +28,7 @@ def test_adv_guiraud():
     input_str = 'hi this is a test string'
     tokens = lex.re_tokenize(input_str)
     # expect 'test' and 'string' to be advanced types
-    assert pytest.approx(lex.adv_guiraud(tokens), 2 / math.sqrt(6))
+    assert lex.adv_guiraud(tokens) == pytest.approx(2 / math.sqrt(6))
 
     input_str_zero_ag = 'this is the'
     tokens_str_zero_ag = lex.re_tokenize(input_str_zero_ag)
@@ -43,9 +43,29 @@ def test_adv_guiraud():
 
 
 def test_vocd():
-    assert pytest.approx(lex.vocd(LONG_TOKENS)) == 83.399341
+    assert pytest.approx(lex.vocd(LONG_TOKENS, seed=0)) == 83.946155
 
-    assert pytest.approx(lex.vocd(LONG_TOKENS, spellcheck=True)) == 132.035466
+    # vocd is a random subsampling estimate, so check the unseeded call
+    # lands near the known D for this text
+    assert 80 < lex.vocd(LONG_TOKENS) < 87
+
+    assert 110 < lex.vocd(LONG_TOKENS, spellcheck=True, seed=0) < 160
+
+    # a text with no repeated types has unbounded D
+    with pytest.raises(ValueError):
+        lex.vocd(['w%d' % i for i in range(60)])
+
+
+def test_vocd_batch():
+    batch = [LONG_TOKENS, LONG_TOKENS[:80]]
+    # a seeded batch is reproducible
+    assert lex.vocd_batch(batch, seed=0) == lex.vocd_batch(batch, seed=0)
+
+
+def test_mtld_batch():
+    batch = [LONG_TOKENS, LONG_TOKENS[:80]]
+    expected = [lex.mtld(tokens) for tokens in batch]
+    assert lex.mtld_batch(batch) == expected
 
 
 def test_ttr():
@@ -62,6 +82,19 @@ def test_mtld():
     assert pytest.approx(lex.mtld(LONG_TOKENS)) == 78.277031
 
 
+def test_lexdoc():
+    doc = lex.LexDoc(LONG_TOKENS)
+    assert doc.n == len(LONG_TOKENS)
+    assert doc.counts['the'] == LONG_TOKENS.count('the')
+
+    # metrics accept a LexDoc and give the same results as the raw list
+    assert lex.ttr(doc) == lex.ttr(LONG_TOKENS)
+    assert lex.mtld(doc) == lex.mtld(LONG_TOKENS)
+    assert lex.maas(doc) == lex.maas(LONG_TOKENS)
+    assert lex.adv_guiraud(doc) == lex.adv_guiraud(LONG_TOKENS)
+    assert lex.vocd(doc, seed=0) == lex.vocd(LONG_TOKENS, seed=0)
+
+
 def test_maas():
     assert pytest.approx(lex.maas(LONG_TOKENS)) == 4.5336033
     assert pytest.approx(lex.maas(LONG_TOKENS, spellcheck=True)) == 4.125937